@@ -10,13 +10,36 @@
 - 支撑：墩支撑 + 简支端支撑
 """
 
+import argparse
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 
-# 设置中文字体支持
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei']
-plt.rcParams['axes.unicode_minus'] = False
+# 材料属性 (C40混凝土)
+E_CONCRETE = 32500e6  # Pa (32.5 GPa)
+
+# 箱形截面尺寸 (外尺寸: 宽1.2m, 高0.8m; 内尺寸: 宽0.8m, 高0.4m)
+BOX_WIDTH_OUTER, BOX_HEIGHT_OUTER = 1.2, 0.8
+BOX_WIDTH_INNER, BOX_HEIGHT_INNER = 0.8, 0.4
+
+# 箱形截面属性 (模块加载时计算一次)
+BOX_A = BOX_WIDTH_OUTER * BOX_HEIGHT_OUTER - BOX_WIDTH_INNER * BOX_HEIGHT_INNER  # 截面积
+BOX_I = (BOX_WIDTH_OUTER * BOX_HEIGHT_OUTER**3
+         - BOX_WIDTH_INNER * BOX_HEIGHT_INNER**3) / 12  # 惯性矩
+
+_fonts_configured = False
+
+def _init_plotting():
+    """延迟导入matplotlib并设置中文字体支持 (仅在绘图时调用，字体每进程只设置一次)"""
+    global _fonts_configured
+    import matplotlib
+    matplotlib.use('Agg')  # 仅保存图片，无需GUI后端
+    import matplotlib.pyplot as plt
+
+    if not _fonts_configured:
+        plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei']
+        plt.rcParams['axes.unicode_minus'] = False
+        _fonts_configured = True
+    return plt
 
 def print_header(title):
     """打印分析标题"""
@@ -24,8 +47,13 @@ def print_header(title):
     print(f"  {title}")
     print("="*60)
 
-def analyze_with_anastruct():
-    """使用anaStruct进行连续梁桥分析"""
+def analyze_with_anastruct(n_elements_per_span=10, plot=True, dpi=150):
+    """使用anaStruct进行连续梁桥分析
+
+    n_elements_per_span为每跨单元数。均布荷载下支反力为节点量，
+    粗网格 (如每跨4个单元) 即可得到精确支反力；绘图时建议保持默认值。
+    plot为False时只输出结果摘要，不生成图表；dpi为输出图片分辨率。
+    """
     print_header("anaStruct 连续梁桥分析")
     
     try:
@@ -34,47 +62,30 @@ def analyze_with_anastruct():
         # 创建结构模型
         ss = SystemElements()
         
-        # 材料属性 (C40混凝土)
-        E = 32500e6  # Pa (32.5 GPa)
-        
-        # 截面属性 (假设箱形截面)
-        # 外尺寸: 宽1.2m, 高0.8m
-        # 内尺寸: 宽0.8m, 高0.4m  
-        width_outer, height_outer = 1.2, 0.8
-        width_inner, height_inner = 0.8, 0.4
-        
-        A = width_outer * height_outer - width_inner * height_inner  # 截面积
-        I = (width_outer * height_outer**3 - width_inner * height_inner**3) / 12  # 惯性矩
+        # 材料与截面属性 (C40混凝土箱形截面)
+        E, A, I = E_CONCRETE, BOX_A, BOX_I
         
         print(f"截面积: {A:.4f} m²")
         print(f"惯性矩: {I:.6f} m⁴")
         
         # 定义节点和单元 (三跨，每跨20m)
-        span_length = 20.0  # 每跨长度
-        n_elements_per_span = 10  # 每跨单元数
-        
-        # 创建节点
-        x_coords = []
-        for span in range(3):
-            for i in range(n_elements_per_span):
-                x = span * span_length + i * span_length / n_elements_per_span
-                x_coords.append(x)
-        x_coords.append(3 * span_length)  # 最后一个节点
-        
-        # 添加梁单元
-        for i in range(len(x_coords) - 1):
-            ss.add_element([[x_coords[i], 0], [x_coords[i+1], 0]], EA=E*A, EI=E*I)
-        
-        # 添加支撑
-        # 端支撑 (简支)
-        ss.add_support_hinged(1)  # 左端铰支
-        ss.add_support_hinged(len(x_coords))  # 右端铰支
-        
-        # 中间墩支撑 (铰支)
-        pier1_node = n_elements_per_span + 1  # 第一个墩位置
-        pier2_node = 2 * n_elements_per_span + 1  # 第二个墩位置
-        ss.add_support_hinged(pier1_node)
-        ss.add_support_hinged(pier2_node)
+        spans = np.array([20.0, 20.0, 20.0])  # 各跨长度
+
+        # 创建节点 (各跨起点由累加跨长得到)
+        span_starts = np.concatenate(([0.0], np.cumsum(spans)))
+        x_coords = np.concatenate(
+            [np.linspace(span_starts[i], span_starts[i + 1], n_elements_per_span, endpoint=False)
+             for i in range(len(spans))]
+            + [span_starts[-1:]]  # 最后一个节点
+        )
+        
+        # 添加梁单元 (按节点序列一次性建立全部单元)
+        ss.add_element_grid(x_coords, np.zeros_like(x_coords), EA=E*A, EI=E*I)
+        
+        # 添加支撑 (两端简支 + 中间墩支撑，均为铰支)
+        # 各支点取距跨端位置最近的节点 (节点编号从1开始)
+        support_nodes = np.argmin(np.abs(x_coords[:, None] - span_starts[None, :]), axis=0) + 1
+        ss.add_support_hinged(support_nodes.tolist())
         
         # 添加荷载
         # 自重 (假设混凝土密度2500 kg/m³)
@@ -85,38 +96,69 @@ def analyze_with_anastruct():
         print(f"恒载: {dead_load:.0f} N/m")
         
         # 施加分布荷载到所有单元
-        for i in range(1, len(x_coords)):
-            ss.q_load(-dead_load, element_id=i)
+        ss.q_load(-dead_load, element_id=list(range(1, len(x_coords))))
         
         # 求解
         print("正在求解...")
         ss.solve()
         
-        # 获取结果
+        # 获取结果 (一次性提取全部节点结果，再按支点筛选)
+        node_results = {res['id']: res for res in ss.get_node_results_system()}
+        reactions = np.fromiter((abs(node_results[node_id]['Fy']) for node_id in support_nodes),
+                                dtype=np.float64, count=len(support_nodes))
+        total_reaction = float(reactions.sum())
+        total_load = dead_load * span_starts[-1]
+
         print("\n结果摘要:")
         print("支反力:")
+        reactions_kn = reactions / 1000.0
+        print("\n".join(
+            f"  节点{node_id} (x={x:.1f}m): {fy:.1f} kN"
+            for node_id, x, fy in zip(support_nodes, x_coords[support_nodes - 1], reactions_kn)
+        ))
+        print(f"支反力合计: {total_reaction/1000:.1f} kN (总荷载 {total_load/1000:.1f} kN, "
+              f"误差 {abs(total_reaction - total_load) / total_load:.2e})")
+        print(f"最大支反力: {reactions_kn.max():.1f} kN")
+
+        if not plot:
+            return ss
         
         # 显示图形
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+        # 一次性提取单元结果后直接绘制，避免anaStruct的show_*逐个重新插值
+        element_results = ss.get_element_results(verbose=True)
+        x_plot = np.concatenate([
+            np.linspace(x_coords[k], x_coords[k + 1], len(res['M']))
+            for k, res in enumerate(element_results)
+        ])
+        moment = np.concatenate([res['M'] for res in element_results])
+        shear = np.concatenate([res['Q'] for res in element_results])
+        deflection = -np.concatenate([res['wtot'] for res in element_results])
+
+        plt = _init_plotting()
+        fig, axes = plt.subplots(2, 2, figsize=(15, 10), constrained_layout=True)
         
         # 结构图
-        ss.show_structure(show=False, scale=1, offset=(0, 0))
+        axes[0,0].plot(x_coords, np.zeros_like(x_coords), 'k-', linewidth=2)
+        axes[0,0].plot(x_coords[support_nodes - 1], np.zeros(len(support_nodes)), 'b^', markersize=12)
         axes[0,0].set_title('结构布置图')
         
         # 弯矩图
-        ss.show_bending_moment(show=False, scale=1)
-        axes[0,1].set_title('弯矩图')
+        axes[0,1].plot(x_plot, moment / 1e3, 'r-')
+        axes[0,1].set_title('弯矩图 (kN·m)')
         
         # 剪力图  
-        ss.show_shear_force(show=False, scale=1)
-        axes[1,0].set_title('剪力图')
+        axes[1,0].plot(x_plot, shear / 1e3, 'g-')
+        axes[1,0].set_title('剪力图 (kN)')
         
         # 位移图
-        ss.show_displacement(show=False, scale=100)
-        axes[1,1].set_title('位移图 (放大100倍)')
+        axes[1,1].plot(x_plot, deflection * 1e3, 'm-')
+        axes[1,1].set_title('位移图 (mm)')
+
+        for ax in axes.flat:
+            ax.axhline(0, color='k', linewidth=0.5)
+            ax.set_xlabel('位置 (m)')
         
-        plt.tight_layout()
-        plt.savefig('anastruct_bridge_analysis.png', dpi=300, bbox_inches='tight')
+        plt.savefig('anastruct_bridge_analysis.png', dpi=dpi)
         print("结果图表已保存为: anastruct_bridge_analysis.png")
         
         return ss
@@ -150,8 +192,13 @@ def analyze_with_xara():
         print(f"分析失败: {e}")
         return None
 
-def test_section_properties():
-    """测试截面属性计算"""
+def test_section_properties(fine=False, plot=True, dpi=150):
+    """测试截面属性计算
+
+    fine为False时使用粗网格且只做几何属性分析 (足够绘图预览)；
+    为True时使用细网格并额外进行翘曲 (扭转) 分析。
+    plot为False时只输出截面属性，不生成图表；dpi为输出图片分辨率。
+    """
     print_header("截面属性计算测试")
     
     try:
@@ -160,21 +207,25 @@ def test_section_properties():
         
         # 创建箱形截面
         # 外矩形
-        outer_rect = sections.rectangular_section(d=0.8, b=1.2)
+        outer_rect = sections.rectangular_section(d=BOX_HEIGHT_OUTER, b=BOX_WIDTH_OUTER)
         # 内矩形 (空心部分)
-        inner_rect = sections.rectangular_section(d=0.4, b=0.8)
-        inner_rect = inner_rect.shift_section(0.2, 0.2)  # 居中
+        inner_rect = sections.rectangular_section(d=BOX_HEIGHT_INNER, b=BOX_WIDTH_INNER)
+        inner_rect = inner_rect.shift_section(
+            (BOX_WIDTH_OUTER - BOX_WIDTH_INNER) / 2,
+            (BOX_HEIGHT_OUTER - BOX_HEIGHT_INNER) / 2,
+        )  # 居中
         
         # 箱形截面 = 外矩形 - 内矩形
         box_section = outer_rect - inner_rect
         
         # 生成网格
-        box_section.create_mesh(mesh_sizes=[0.01])
+        box_section.create_mesh(mesh_sizes=[0.01] if fine else [0.04])
         
-        # 分析截面
+        # 分析截面 (翘曲分析仅在需要扭转属性时进行)
         section = Section(box_section)
         section.calculate_geometric_properties()
-        section.calculate_warping_properties()
+        if fine:
+            section.calculate_warping_properties()
         
         # 显示结果
         print(f"截面积: {section.get_area():.6f} m²")
@@ -182,9 +233,13 @@ def test_section_properties():
         print(f"Iyy: {section.get_iyy():.6f} m⁴")
         print(f"质心x坐标: {section.get_c()[0]:.6f} m")
         print(f"质心y坐标: {section.get_c()[1]:.6f} m")
+
+        if not plot:
+            return section
         
         # 绘图
-        fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+        plt = _init_plotting()
+        fig, axes = plt.subplots(1, 2, figsize=(12, 5), constrained_layout=True)
         
         # 截面几何
         section.plot_mesh(ax=axes[0], materials=False)
@@ -195,8 +250,7 @@ def test_section_properties():
         section.plot_stress_mxx(ax=axes[1])
         axes[1].set_title('弯矩应力分布')
         
-        plt.tight_layout()
-        plt.savefig('section_properties_analysis.png', dpi=300, bbox_inches='tight')
+        plt.savefig('section_properties_analysis.png', dpi=dpi)
         print("截面分析结果已保存为: section_properties_analysis.png")
         
         return section
@@ -223,24 +277,37 @@ def generate_summary_report():
     
     print("\n库名称\t\t状态\t描述")
     print("-" * 60)
-    for name, status, desc in libraries_tested:
-        print(f"{name:15}\t{status}\t{desc}")
+    print("\n".join(f"{name:15}\t{status}\t{desc}" for name, status, desc in libraries_tested))
     
     print(f"\n分析时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("Mac环境: Apple Silicon (ARM64)")
     print("Python环境: Conda fem_analysis")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="三跨连续梁桥FEM分析测试")
+    parser.add_argument("--fine", action="store_true",
+                        help="截面分析使用细网格并进行翘曲分析")
+    parser.add_argument("--elements", type=int, default=10,
+                        help="anaStruct分析中每跨单元数 (默认10)")
+    parser.add_argument("--no-plot", action="store_true",
+                        help="只输出计算结果，不生成PNG图表")
+    parser.add_argument("--dpi", type=int, default=150,
+                        help="输出图片分辨率 (默认150，出版用图可设为300)")
+    args = parser.parse_args()
+
     print("🌉 三跨连续梁桥FEM分析测试")
     print("测试多种FEM库在Apple Silicon Mac上的表现")
     
     # 运行各种分析
-    anastruct_result = analyze_with_anastruct()
+    anastruct_result = analyze_with_anastruct(n_elements_per_span=args.elements,
+                                              plot=not args.no_plot, dpi=args.dpi)
     xara_result = analyze_with_xara()
-    section_result = test_section_properties()
+    section_result = test_section_properties(fine=args.fine, plot=not args.no_plot,
+                                             dpi=args.dpi)
     
     # 生成总结报告
     generate_summary_report()
     
     print("\n✅ 所有测试完成！")
-    print("请查看生成的PNG图片文件了解分析结果。") 
\ No newline at end of file
+    if not args.no_plot:
+        print("请查看生成的PNG图片文件了解分析结果。") 
\ No newline at end of file